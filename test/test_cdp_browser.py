@@ -0,0 +1,165 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import socket
+from typing import Dict, List, Tuple
+from unittest import IsolatedAsyncioTestCase
+
+import httpx
+
+from tools.cdp_browser import CDPBrowserManager
+
+
+def _get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _StubCDPServer:
+    """
+    模拟浏览器CDP的HTTP接口，按路径返回预设的状态码和JSON
+    """
+
+    def __init__(self, routes: Dict[str, Tuple[int, object]]):
+        self.routes = routes
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        path = request_line.decode().split(" ")[1]
+        status, data = self.routes.get(path, (404, {}))
+        body = json.dumps(data).encode()
+        writer.write(
+            f"HTTP/1.1 {status} STUB\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        writer.close()
+
+
+class _FakeCDPSession:
+    def __init__(self, cookies: List[Dict]):
+        self.cookies = cookies
+        self.detached = False
+
+    async def send(self, method: str):
+        assert method == "Storage.getCookies"
+        return {"cookies": self.cookies}
+
+    async def detach(self):
+        self.detached = True
+
+
+class _FakeBrowser:
+    def __init__(self, cdp_session: _FakeCDPSession):
+        self.cdp_session = cdp_session
+
+    async def new_browser_cdp_session(self):
+        return self.cdp_session
+
+
+class TestCDPBrowserManager(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.manager = CDPBrowserManager()
+        self.server = None
+
+    async def asyncTearDown(self):
+        if self.manager._http:
+            await self.manager._http.aclose()
+        if self.server:
+            await self.server.stop()
+
+    async def _start_server(self, routes: Dict[str, Tuple[int, object]]):
+        self.server = _StubCDPServer(routes)
+        await self.server.start()
+        self.manager.debug_port = self.server.port
+        self.manager._http = httpx.AsyncClient(base_url=f"http://127.0.0.1:{self.server.port}")
+
+    async def test_test_cdp_connection_caches_ws_url(self):
+        ws_url = "ws://127.0.0.1/devtools/browser/stub"
+        await self._start_server({"/json/version": (200, {"webSocketDebuggerUrl": ws_url})})
+
+        self.assertEqual(await self.manager._test_cdp_connection(), ws_url)
+        self.assertEqual(self.manager._ws_url, ws_url)
+
+        # 缓存命中后不再请求接口
+        await self.server.stop()
+        self.server = None
+        self.assertEqual(await self.manager._get_browser_websocket_url(), ws_url)
+
+    async def test_test_cdp_connection_returns_none_on_non_200(self):
+        await self._start_server({"/json/version": (500, {"webSocketDebuggerUrl": "ws://unused"})})
+
+        self.assertIsNone(await self.manager._test_cdp_connection())
+        self.assertIsNone(self.manager._ws_url)
+
+    async def test_port_open_returns_false_when_closed(self):
+        self.assertFalse(await self.manager._port_open(_get_free_port()))
+
+    async def test_port_open_returns_true_when_listening(self):
+        await self._start_server({})
+        self.assertTrue(await self.manager._port_open(self.server.port))
+
+    async def test_await_cdp_up_times_out_when_nothing_answers(self):
+        port = _get_free_port()
+        self.manager.debug_port = port
+        self.manager._http = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}")
+
+        self.assertFalse(await self.manager._await_cdp_up(timeout=1))
+
+    async def test_get_browser_cookies_filters_and_dedups(self):
+        await self._start_server({
+            "/json": (200, [
+                {"type": "page", "url": "https://www.xiaohongshu.com/explore"},
+                {"type": "page", "url": "https://www.xiaohongshu.com/user/profile/1"},
+                {"type": "service_worker", "url": "https://www.douyin.com/sw.js"},
+                {"type": "page", "url": "chrome://newtab/"},
+            ]),
+        })
+        cdp_session = _FakeCDPSession([
+            {"name": "a1", "value": "old", "domain": ".xiaohongshu.com", "path": "/",
+             "expires": -1, "httpOnly": False, "secure": True, "session": True, "sameSite": "Lax"},
+            {"name": "a1", "value": "new", "domain": ".xiaohongshu.com", "path": "/",
+             "expires": -1, "httpOnly": False, "secure": True, "session": True},
+            {"name": "a1", "value": "host", "domain": "www.xiaohongshu.com", "path": "/",
+             "expires": -1, "httpOnly": True, "secure": True, "session": True},
+            {"name": "ttwid", "value": "x", "domain": ".douyin.com", "path": "/",
+             "expires": -1, "httpOnly": True, "secure": True, "session": True},
+        ])
+        self.manager.browser = _FakeBrowser(cdp_session)
+
+        cookies = await self.manager._get_browser_cookies()
+
+        self.assertTrue(cdp_session.detached)
+        self.assertEqual(
+            sorted((c["name"], c["domain"], c["value"]) for c in cookies),
+            [("a1", ".xiaohongshu.com", "new"), ("a1", "www.xiaohongshu.com", "host")],
+        )
+        # 转换为add_cookies格式，去掉CDP特有字段
+        self.assertTrue(all("session" not in c for c in cookies))
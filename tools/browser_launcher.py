@@ -12,10 +12,9 @@
 import os
 import platform
 import subprocess
-import time
 import socket
 import signal
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import asyncio
 from pathlib import Path
 
@@ -32,12 +31,18 @@ class BrowserLauncher:
         self.system = platform.system()
         self.browser_process = None
         self.debug_port = None
+        # 缓存浏览器路径检测结果和浏览器信息，避免重复扫描文件系统、启动浏览器进程查询版本
+        self._browser_paths_cache: Optional[List[str]] = None
+        self._browser_info_cache: Dict[str, Tuple[str, str]] = {}
         
     def detect_browser_paths(self) -> List[str]:
         """
         检测系统中可用的浏览器路径
         返回按优先级排序的浏览器路径列表
         """
+        if self._browser_paths_cache is not None:
+            return list(self._browser_paths_cache)
+
         paths = []
         
         if self.system == "Windows":
@@ -89,8 +94,9 @@ class BrowserLauncher:
         for path in possible_paths:
             if os.path.isfile(path) and os.access(path, os.X_OK):
                 paths.append(path)
-                
-        return paths
+
+        self._browser_paths_cache = paths
+        return list(paths)
     
     def find_available_port(self, start_port: int = 9222) -> int:
         """
@@ -179,33 +185,13 @@ class BrowserLauncher:
             utils.logger.error(f"[BrowserLauncher] 启动浏览器失败: {e}")
             raise
     
-    def wait_for_browser_ready(self, debug_port: int, timeout: int = 30) -> bool:
-        """
-        等待浏览器准备就绪
-        """
-        utils.logger.info(f"[BrowserLauncher] 等待浏览器在端口 {debug_port} 上准备就绪...")
-        
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(1)
-                    result = s.connect_ex(('localhost', debug_port))
-                    if result == 0:
-                        utils.logger.info(f"[BrowserLauncher] 浏览器已在端口 {debug_port} 上准备就绪")
-                        return True
-            except Exception:
-                pass
-            
-            time.sleep(0.5)
-        
-        utils.logger.error(f"[BrowserLauncher] 浏览器在 {timeout} 秒内未能准备就绪")
-        return False
-    
     def get_browser_info(self, browser_path: str) -> Tuple[str, str]:
         """
         获取浏览器信息（名称和版本）
         """
+        if browser_path in self._browser_info_cache:
+            return self._browser_info_cache[browser_path]
+
         try:
             if "chrome" in browser_path.lower():
                 name = "Google Chrome"
@@ -223,7 +209,8 @@ class BrowserLauncher:
                 version = result.stdout.strip() if result.stdout else "Unknown Version"
             except:
                 version = "Unknown Version"
-            
+
+            self._browser_info_cache[browser_path] = (name, version)
             return name, version
             
         except Exception:
@@ -13,7 +13,8 @@ import os
 import asyncio
 import socket
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
+from urllib.parse import urlparse
 from playwright.async_api import Browser, BrowserContext, Playwright
 
 import config
@@ -31,6 +32,11 @@ class CDPBrowserManager:
         self.browser: Optional[Browser] = None
         self.browser_context: Optional[BrowserContext] = None
         self.debug_port: Optional[int] = None
+        # 缓存/json/version返回的webSocketDebuggerUrl，避免重复请求
+        self._ws_url: Optional[str] = None
+        # 复用同一个HTTP客户端访问CDP接口，避免每次请求都重新建立连接池
+        # 在确定调试端口后创建，见launch_and_connect
+        self._http: Optional[httpx.AsyncClient] = None
 
     async def launch_and_connect(
         self,
@@ -46,7 +52,27 @@ class CDPBrowserManager:
         try:
             # 1. 先检查指定端口是否已有浏览器在运行
             self.debug_port = config.CDP_DEBUG_PORT
-            if await self._test_cdp_connection(self.debug_port):
+            # 重复调用时先关闭旧的客户端，避免连接池泄漏
+            if self._http:
+                await self._http.aclose()
+            # 使用127.0.0.1而非localhost，避免部分Windows环境下优先尝试IPv6导致超时
+            # 仅用于向本地CDP接口发送少量小请求：连接超时设短以便端口空闲时快速失败，
+            # 连接池保持较小，CDP服务不支持HTTP/2，也无需自动重试
+            self._http = httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{self.debug_port}",
+                timeout=httpx.Timeout(connect=0.3, read=2.0, write=1.0, pool=1.0),
+                transport=httpx.AsyncHTTPTransport(
+                    http2=False,
+                    retries=0,
+                    limits=httpx.Limits(
+                        max_connections=4,
+                        max_keepalive_connections=2,
+                        keepalive_expiry=30.0,
+                    ),
+                ),
+            )
+            # 先用TCP连接快速判断端口是否有服务监听，端口空闲时省去HTTP请求
+            if await self._port_open(self.debug_port) and await self._test_cdp_connection():
                 # 端口已被占用，说明已有浏览器在运行，直接连接
                 utils.logger.info(
                     f"[CDPBrowserManager] 检测到端口 {self.debug_port} 已有浏览器在运行，直接连接"
@@ -109,32 +135,42 @@ class CDPBrowserManager:
 
         return browser_path
 
-    async def _test_cdp_connection(self, debug_port: int) -> bool:
+    async def _port_open(self, port: int) -> bool:
+        """
+        检测本地端口是否有服务在监听（仅建立TCP连接，不发送HTTP请求）
+        """
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection("127.0.0.1", port), timeout=0.3
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+    async def _test_cdp_connection(self) -> Optional[str]:
         """
         测试CDP连接是否可用
-        通过尝试获取WebSocket URL来判断浏览器是否已在运行
+        通过尝试获取WebSocket URL来判断浏览器是否已在运行，
+        成功时返回并缓存WebSocket URL，否则返回None
         """
         try:
             # 尝试获取WebSocket URL，如果能获取到说明浏览器已经在运行
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"http://localhost:{debug_port}/json/version", timeout=2
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    ws_url = data.get("webSocketDebuggerUrl")
-                    if ws_url:
-                        utils.logger.info(
-                            f"[CDPBrowserManager] CDP端口 {debug_port} 已有浏览器在运行"
-                        )
-                        return True
-            return False
+            response = await self._http.get("/json/version")
+            if response.status_code == 200:
+                data = response.json()
+                ws_url = data.get("webSocketDebuggerUrl")
+                if ws_url:
+                    self._ws_url = ws_url
+                    return ws_url
+            return None
         except (httpx.ConnectError, httpx.TimeoutException, httpx.HTTPError):
             # 连接失败，说明端口未被占用或浏览器未运行
-            return False
+            return None
         except Exception as e:
             utils.logger.warning(f"[CDPBrowserManager] CDP连接测试失败: {e}")
-            return False
+            return None
 
     async def _launch_browser(self, browser_path: str, headless: bool):
         """
@@ -160,41 +196,53 @@ class CDPBrowserManager:
         )
 
         # 等待浏览器准备就绪
-        if not self.launcher.wait_for_browser_ready(
-            self.debug_port, config.BROWSER_LAUNCH_TIMEOUT
-        ):
+        if not await self._await_cdp_up(config.BROWSER_LAUNCH_TIMEOUT):
             raise RuntimeError(f"浏览器在 {config.BROWSER_LAUNCH_TIMEOUT} 秒内未能启动")
 
-        # 额外等待一秒让CDP服务完全启动
-        await asyncio.sleep(1)
+    async def _await_cdp_up(self, timeout: int) -> bool:
+        """
+        异步等待CDP服务可用，轮询期间不阻塞事件循环
+        """
+        utils.logger.info(
+            f"[CDPBrowserManager] 等待浏览器在端口 {self.debug_port} 上准备就绪..."
+        )
 
-        # 测试CDP连接
-        if not await self._test_cdp_connection(self.debug_port):
-            utils.logger.warning(
-                "[CDPBrowserManager] CDP连接测试失败，但将继续尝试连接"
+        async def _poll():
+            while not await self._test_cdp_connection():
+                await asyncio.sleep(0.1)
+
+        try:
+            await asyncio.wait_for(_poll(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            utils.logger.error(
+                f"[CDPBrowserManager] 浏览器在 {timeout} 秒内未能准备就绪"
             )
+            return False
 
-    async def _get_browser_websocket_url(self, debug_port: int) -> str:
+    async def _get_browser_websocket_url(self) -> str:
         """
         获取浏览器的WebSocket连接URL
+        优先使用连接测试时缓存的URL
         """
+        if self._ws_url:
+            return self._ws_url
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"http://localhost:{debug_port}/json/version", timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    ws_url = data.get("webSocketDebuggerUrl")
-                    if ws_url:
-                        utils.logger.info(
-                            f"[CDPBrowserManager] 获取到浏览器WebSocket URL: {ws_url}"
-                        )
-                        return ws_url
-                    else:
-                        raise RuntimeError("未找到webSocketDebuggerUrl")
+            response = await self._http.get("/json/version")
+            if response.status_code == 200:
+                data = response.json()
+                ws_url = data.get("webSocketDebuggerUrl")
+                if ws_url:
+                    utils.logger.info(
+                        f"[CDPBrowserManager] 获取到浏览器WebSocket URL: {ws_url}"
+                    )
+                    self._ws_url = ws_url
+                    return ws_url
                 else:
-                    raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+                    raise RuntimeError("未找到webSocketDebuggerUrl")
+            else:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
         except Exception as e:
             utils.logger.error(f"[CDPBrowserManager] 获取WebSocket URL失败: {e}")
             raise
@@ -205,7 +253,7 @@ class CDPBrowserManager:
         """
         try:
             # 获取正确的WebSocket URL
-            ws_url = await self._get_browser_websocket_url(self.debug_port)
+            ws_url = await self._get_browser_websocket_url()
             utils.logger.info(f"[CDPBrowserManager] 正在通过CDP连接到浏览器: {ws_url}")
 
             # 使用Playwright的connectOverCDP方法连接
@@ -249,15 +297,6 @@ class CDPBrowserManager:
                 utils.logger.info(
                     f"[CDPBrowserManager] 现有上下文中有 {len(pages)} 个页面，将共享Cookie"
                 )
-                # 尝试从第一个页面获取Cookie以验证登录状态
-                try:
-                    cookies = await pages[0].context.cookies()
-                    if cookies:
-                        utils.logger.info(
-                            f"[CDPBrowserManager] 从现有页面获取到 {len(cookies)} 个Cookie"
-                        )
-                except Exception as e:
-                    utils.logger.warning(f"[CDPBrowserManager] 获取Cookie时出错: {e}")
         else:
             # 没有现有上下文，创建新的上下文
             # 注意：新上下文可能没有Cookie，需要手动登录或设置Cookie
@@ -279,106 +318,37 @@ class CDPBrowserManager:
                 )
 
             browser_context = await self.browser.new_context(**context_options)
+
+            # 已配置Cookie登录时，各平台的登录流程会按平台域名注入config.COOKIES，
+            # 无需再从浏览器中获取Cookie
+            if config.LOGIN_TYPE == "cookie" and config.COOKIES:
+                utils.logger.info(
+                    "[CDPBrowserManager] 创建了新的浏览器上下文，"
+                    "已配置config.COOKIES，跳过从浏览器中获取Cookie"
+                )
+                return browser_context
+
             utils.logger.warning(
                 "[CDPBrowserManager] 创建了新的浏览器上下文，可能没有登录状态。"
                 "尝试从浏览器中获取Cookie..."
             )
-            
+
             # 尝试从浏览器的现有页面中获取Cookie
             # 当用户手动启动浏览器时，浏览器中可能有已打开的标签页
             try:
-                # 获取所有目标（标签页）
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"http://localhost:{self.debug_port}/json", timeout=2
+                unique_cookies = await self._get_browser_cookies()
+                # 如果找到了Cookie，添加到新上下文
+                # add_cookies直接通过CDP设置Cookie，无需先导航到对应域名
+                if unique_cookies:
+                    await browser_context.add_cookies(unique_cookies)
+                    utils.logger.info(
+                        f"[CDPBrowserManager] 已从浏览器中复制 {len(unique_cookies)} 个Cookie到新上下文"
+                    )
+                else:
+                    utils.logger.warning(
+                        "[CDPBrowserManager] 未能从浏览器中获取Cookie。"
+                        "请确保浏览器中已有登录的标签页，或使用config.COOKIES配置Cookie。"
                     )
-                    if response.status_code == 200:
-                        targets = response.json()
-                        all_cookies = []
-                        domains_checked = set()
-                        
-                        # 从每个目标中获取Cookie
-                        for target in targets:
-                            if target.get("type") == "page":
-                                page_url = target.get("url", "")
-                                if page_url and page_url.startswith("http"):
-                                    try:
-                                        # 解析域名
-                                        from urllib.parse import urlparse
-                                        parsed = urlparse(page_url)
-                                        domain = parsed.netloc
-                                        
-                                        # 避免重复获取同一域名的Cookie
-                                        if domain in domains_checked:
-                                            continue
-                                        domains_checked.add(domain)
-                                        
-                                        # 使用CDP获取该域名的Cookie
-                                        # 通过创建临时页面来获取Cookie
-                                        temp_page = await browser_context.new_page()
-                                        try:
-                                            # 导航到目标URL以获取Cookie
-                                            await temp_page.goto(page_url, wait_until="domcontentloaded", timeout=5000)
-                                            # 获取该页面的Cookie
-                                            cookies = await temp_page.context.cookies()
-                                            # 过滤出该域名的Cookie
-                                            domain_cookies = [
-                                                c for c in cookies 
-                                                if domain in c.get("domain", "") or c.get("domain", "").lstrip(".") in domain
-                                            ]
-                                            all_cookies.extend(domain_cookies)
-                                        except Exception as page_error:
-                                            utils.logger.debug(f"获取页面 {page_url} 的Cookie时出错: {page_error}")
-                                        finally:
-                                            await temp_page.close()
-                                    except Exception as e:
-                                        utils.logger.debug(f"处理目标 {target.get('id')} 时出错: {e}")
-                        
-                        # 去重Cookie（基于name和domain）
-                        seen = set()
-                        unique_cookies = []
-                        for cookie in all_cookies:
-                            key = (cookie.get("name"), cookie.get("domain"))
-                            if key not in seen:
-                                seen.add(key)
-                                unique_cookies.append(cookie)
-                        
-                        # 如果找到了Cookie，添加到新上下文
-                        if unique_cookies:
-                            # 需要先导航到一个页面才能设置Cookie
-                            temp_page = await browser_context.new_page()
-                            try:
-                                # 按域名分组设置Cookie
-                                cookies_by_domain = {}
-                                for cookie in unique_cookies:
-                                    domain = cookie.get("domain", "").lstrip(".")
-                                    if domain not in cookies_by_domain:
-                                        cookies_by_domain[domain] = []
-                                    cookies_by_domain[domain].append(cookie)
-                                
-                                # 为每个域名设置Cookie（需要先导航到该域名）
-                                for domain, cookies in cookies_by_domain.items():
-                                    try:
-                                        await temp_page.goto(f"https://{domain}", wait_until="domcontentloaded", timeout=5000)
-                                        await browser_context.add_cookies(cookies)
-                                    except Exception:
-                                        # 如果HTTPS失败，尝试HTTP
-                                        try:
-                                            await temp_page.goto(f"http://{domain}", wait_until="domcontentloaded", timeout=5000)
-                                            await browser_context.add_cookies(cookies)
-                                        except Exception:
-                                            pass
-                                
-                                utils.logger.info(
-                                    f"[CDPBrowserManager] 已从浏览器中复制 {len(unique_cookies)} 个Cookie到新上下文"
-                                )
-                            finally:
-                                await temp_page.close()
-                        else:
-                            utils.logger.warning(
-                                "[CDPBrowserManager] 未能从浏览器中获取Cookie。"
-                                "请确保浏览器中已有登录的标签页，或使用config.COOKIES配置Cookie。"
-                            )
             except Exception as e:
                 utils.logger.warning(
                     f"[CDPBrowserManager] 尝试获取浏览器Cookie时出错: {e}。"
@@ -387,6 +357,65 @@ class CDPBrowserManager:
 
         return browser_context
 
+    async def _get_browser_cookies(self) -> List[Dict]:
+        """
+        获取浏览器中已打开标签页所属域名的Cookie
+        新创建的上下文拥有独立的Cookie存储，因此通过浏览器级CDP会话读取默认上下文中的Cookie
+        """
+        # 获取所有目标（标签页）
+        response = await self._http.get("/json")
+        if response.status_code != 200:
+            return []
+
+        # 解析后立即只保留http(s)页面目标，丢弃service worker、扩展等其他目标，并按域名去重
+        hosts = {
+            urlparse(t["url"]).hostname for t in response.json()
+            if t.get("type") == "page" and (t.get("url") or "").startswith("http")
+        }
+        hosts.discard(None)
+        if not hosts:
+            return []
+
+        cdp_session = await self.browser.new_browser_cdp_session()
+        try:
+            # 不指定browserContextId时返回默认上下文中的Cookie
+            result = await cdp_session.send("Storage.getCookies")
+        finally:
+            await cdp_session.detach()
+
+        # 只保留标签页所属域名的Cookie，并去重Cookie（基于name和domain）
+        return list({
+            (c.get("name"), c.get("domain")): self._to_playwright_cookie(c)
+            for c in result.get("cookies", [])
+            if self._cookie_matches_hosts(c.get("domain", ""), hosts)
+        }.values())
+
+    @staticmethod
+    def _cookie_matches_hosts(cookie_domain: str, hosts: Set[str]) -> bool:
+        """
+        判断Cookie的域名是否属于给定的主机名（主机名本身或其父域名）
+        """
+        cookie_domain = cookie_domain.lstrip(".")
+        if not cookie_domain:
+            return False
+        return any(
+            host == cookie_domain or host.endswith(f".{cookie_domain}") for host in hosts
+        )
+
+    @staticmethod
+    def _to_playwright_cookie(cdp_cookie: Dict) -> Dict:
+        """
+        将CDP返回的Cookie转换为Playwright add_cookies接受的格式
+        """
+        cookie = {
+            key: cdp_cookie[key]
+            for key in ("name", "value", "domain", "path", "expires", "httpOnly", "secure")
+            if key in cdp_cookie
+        }
+        if cdp_cookie.get("sameSite") in ("Strict", "Lax", "None"):
+            cookie["sameSite"] = cdp_cookie["sameSite"]
+        return cookie
+
     async def add_stealth_script(self, script_path: str = "libs/stealth.min.js"):
         """
         添加反检测脚本
@@ -429,7 +458,8 @@ class CDPBrowserManager:
         清理资源
         """
         try:
-            # 关闭浏览器上下文
+            # 依次关闭浏览器上下文和断开浏览器连接
+            # browser.close()会清理其创建的上下文，因此不能与上下文的关闭并发执行
             if self.browser_context:
                 try:
                     await self.browser_context.close()
@@ -441,7 +471,6 @@ class CDPBrowserManager:
                 finally:
                     self.browser_context = None
 
-            # 断开浏览器连接
             if self.browser:
                 try:
                     await self.browser.close()
@@ -463,6 +492,11 @@ class CDPBrowserManager:
 
         except Exception as e:
             utils.logger.error(f"[CDPBrowserManager] 清理资源时出错: {e}")
+        finally:
+            self._ws_url = None
+            if self._http:
+                await self._http.aclose()
+                self._http = None
 
     def is_connected(self) -> bool:
         """